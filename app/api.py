@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import zipfile
 from fastapi import Depends, FastAPI, File, Form, HTTPException, UploadFile
 from fastapi.responses import JSONResponse
@@ -22,14 +24,18 @@ async def analyze(
     if not code_zip.filename or not code_zip.filename.endswith(".zip"):
         raise HTTPException(status_code=400, detail="Uploaded file must be a .zip archive.")
 
+    # Extraction and temp-dir cleanup are blocking disk work, so both run in a
+    # worker thread instead of on the event loop.
+    workspace = contextlib.ExitStack()
     try:
-        with unpack_zip_file(code_zip) as repo_path:
-            report = analyze_repository(problem_description, repo_path, settings)
+        repo_path = await asyncio.to_thread(workspace.enter_context, unpack_zip_file(code_zip))
+        report = await analyze_repository(problem_description, repo_path, settings)
     except zipfile.BadZipFile as exc:
         raise HTTPException(status_code=400, detail="Invalid zip archive.") from exc
     except ReportGenerationError as exc:
         raise HTTPException(status_code=502, detail=str(exc)) from exc
     finally:
+        await asyncio.to_thread(workspace.close)
         await code_zip.close()
 
     return JSONResponse(content=report)
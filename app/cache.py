@@ -0,0 +1,84 @@
+"""Persistent on-disk cache for file summaries."""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILENAME = "summaries.sqlite3"
+
+
+def content_digest(data: bytes) -> str:
+    """Return the hex sha256 digest used to key cached entries."""
+
+    return hashlib.sha256(data).hexdigest()
+
+
+def make_cache_key(*parts: object) -> str:
+    """Combine key components into a single stable cache key."""
+
+    return content_digest("\x1f".join(str(part) for part in parts).encode("utf-8"))
+
+
+class SummaryCache:
+    """SQLite-backed key/value store mapping cache keys to JSON payloads."""
+
+    def __init__(self, directory: Path):
+        self.path = directory / CACHE_FILENAME
+        directory.mkdir(parents=True, exist_ok=True)
+        with self._transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS summaries (key TEXT PRIMARY KEY, payload TEXT NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with self._transaction() as conn:
+                row = conn.execute("SELECT payload FROM summaries WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as exc:
+            logger.warning("Summary cache lookup failed: %s", exc)
+            return None
+        if row is None:
+            return None
+        try:
+            return json.loads(row[0])
+        except json.JSONDecodeError:
+            return None
+
+    def set(self, key: str, payload: Dict[str, Any]) -> None:
+        try:
+            with self._transaction() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO summaries (key, payload) VALUES (?, ?)",
+                    (key, json.dumps(payload, ensure_ascii=False)),
+                )
+        except sqlite3.Error as exc:
+            logger.warning("Summary cache write failed: %s", exc)
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+
+def open_summary_cache(directory: Optional[str]) -> Optional[SummaryCache]:
+    """Return a cache rooted at directory, or None when caching is disabled."""
+
+    if not directory:
+        return None
+    try:
+        return SummaryCache(Path(directory).expanduser())
+    except (OSError, sqlite3.Error) as exc:
+        logger.warning("Summary cache disabled: %s", exc)
+        return None
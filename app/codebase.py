@@ -2,10 +2,17 @@
 
 from __future__ import annotations
 
+import ast
+from array import array
+from bisect import bisect_right
+from collections import defaultdict, deque
 from dataclasses import dataclass
+from itertools import accumulate, repeat
+from operator import sub
+import os
 import re
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator
 
 from .config import Settings
 
@@ -73,6 +80,9 @@ SKIP_DIR_NAMES = {
     ".pytest_cache",
 }
 
+BONUS_LANGUAGES = frozenset({"Python", "TypeScript", "JavaScript"})
+BONUS_DIR_NAMES = frozenset({"src", "app", "server", "service"})
+
 
 @dataclass
 class FileCandidate:
@@ -91,42 +101,97 @@ class SymbolInfo:
     line_end: int
 
 
-def collect_source_candidates(root: Path, settings: Settings) -> list[FileCandidate]:
-    """Return prioritized list of source files worth summarizing."""
+class SymbolTable:
+    """Column-oriented symbol storage; indexing yields SymbolInfo views.
 
-    candidates: list[FileCandidate] = []
-    for file_path in iter_source_files(root):
-        size = file_path.stat().st_size
-        if size == 0 or size > settings.max_file_bytes:
-            continue
+    Line numbers live in unboxed ``array('I')`` columns, which keeps large
+    tables compact compared to one dataclass instance per symbol.
+    """
 
-        ext = file_path.suffix.lower()
-        language = SOURCE_EXTENSIONS.get(ext)
-        if not language:
-            continue
+    __slots__ = ("names", "kinds", "starts", "ends")
 
-        relative = file_path.relative_to(root)
-        weight = compute_weight(relative, size, language)
-        candidates.append(FileCandidate(file_path, relative, language, size, weight))
+    def __init__(self) -> None:
+        self.names: list[str] = []
+        self.kinds: list[str] = []
+        self.starts = array("I")
+        self.ends = array("I")
 
-    candidates.sort(key=lambda c: c.weight, reverse=True)
+    def append(self, name: str, kind: str, line_start: int, line_end: int) -> None:
+        self.names.append(name)
+        self.kinds.append(kind)
+        self.starts.append(line_start)
+        self.ends.append(line_end)
+
+    def rows(self) -> Iterator[tuple[str, str, int, int]]:
+        """Yield (name, kind, line_start, line_end) tuples without building views."""
 
+        return zip(self.names, self.kinds, self.starts, self.ends)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getitem__(self, index: int) -> SymbolInfo:
+        return SymbolInfo(self.names[index], self.kinds[index], self.starts[index], self.ends[index])
+
+def scan_repository(root: Path, settings: Settings) -> tuple[list[FileCandidate], str]:
+    """Collect source candidates and the directory overview in a single walk."""
+
+    candidates: list[FileCandidate] = []
+    tree_entries: list[tuple[os.DirEntry, str, int]] = []
+    for entry, relative_name, depth in _scan_tree(root):
+        if depth <= MAX_TREE_DEPTH:
+            tree_entries.append((entry, relative_name, depth))
+        if not entry.is_file():
+            continue
+        candidate = _make_candidate(entry, relative_name, settings)
+        if candidate is not None:
+            candidates.append(candidate)
+
+    candidates.sort(key=lambda c: c.weight, reverse=True)
     if len(candidates) > settings.max_candidate_files:
         candidates = candidates[: settings.max_candidate_files]
-    return candidates
+    return candidates, _format_directory_overview(tree_entries)
 
 
-def iter_source_files(root: Path) -> Iterable[Path]:
-    """Yield source files under root respecting skip rules."""
+def _make_candidate(entry: os.DirEntry, relative_name: str, settings: Settings) -> FileCandidate | None:
+    ext = os.path.splitext(entry.name)[1].lower()
+    language = SOURCE_EXTENSIONS.get(ext)
+    if not language:
+        return None
 
-    for path in root.rglob("*"):
-        if not path.is_file():
-            continue
-        if path.suffix.lower() in SKIP_EXTENSIONS:
-            continue
-        if any(part in SKIP_DIR_NAMES for part in path.parts):
+    size = entry.stat().st_size
+    if size == 0 or size > settings.max_file_bytes:
+        return None
+
+    relative = Path(relative_name)
+    weight = compute_weight(relative, size, language)
+    return FileCandidate(Path(entry.path), relative, language, size, weight)
+
+
+def _scan_tree(root: Path) -> Iterator[tuple[os.DirEntry, str, int]]:
+    """Yield (entry, relative path, depth) below root, pruning skipped directories.
+
+    Uses os.scandir so file type checks are answered from the directory listing
+    instead of a separate stat call per entry.
+    """
+
+    stack: deque[tuple[str, str, int]] = deque([(os.fspath(root), "", 1)])
+    while stack:
+        directory, relative_dir, depth = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
             continue
-        yield path
+        for entry in entries:
+            relative_name = f"{relative_dir}{entry.name}"
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name in SKIP_DIR_NAMES:
+                    continue
+                yield entry, relative_name, depth
+                stack.append((entry.path, f"{relative_name}/", depth + 1))
+            else:
+                yield entry, relative_name, depth
 
 
 def compute_weight(relative_path: Path, size: int, language: str) -> float:
@@ -135,138 +200,172 @@ def compute_weight(relative_path: Path, size: int, language: str) -> float:
     depth = max(len(relative_path.parts) - 1, 0)
     depth_penalty = 1.0 / (1 + depth)
     size_score = 1.0 / (1 + size / 2000)
-    language_bonus = 1.5 if language in {"Python", "TypeScript", "JavaScript"} else 1.0
-    special_bonus = 1.2 if any(segment in {"src", "app", "server", "service"} for segment in relative_path.parts) else 1.0
+    language_bonus = 1.5 if language in BONUS_LANGUAGES else 1.0
+    special_bonus = 1.2 if not BONUS_DIR_NAMES.isdisjoint(relative_path.parts) else 1.0
     return depth_penalty * size_score * language_bonus * special_bonus
 
 
-def build_directory_overview(root: Path) -> str:
-    """Return a condensed textual tree of the repository."""
+def _format_directory_overview(tree_entries: Iterable[tuple[os.DirEntry, str, int]]) -> str:
+    """Render entries breadth-first, sorting only each directory's children."""
 
-    root = root.resolve()
-    lines: list[str] = []
-    all_paths = sorted(root.rglob("*"), key=lambda p: (len(p.relative_to(root).parts), p.as_posix()))
-    for path in all_paths:
-        if path == root:
-            continue
-        relative = path.relative_to(root)
-        depth = len(relative.parts)
-        if depth > MAX_TREE_DEPTH:
+    children: dict[str, list[tuple[bool, str, str]]] = defaultdict(list)
+    for entry, relative_name, _ in tree_entries:
+        is_file = not entry.is_dir(follow_symlinks=False)
+        if is_file and os.path.splitext(entry.name)[1].lower() in SKIP_EXTENSIONS:
             continue
+        parent = relative_name.rpartition("/")[0]
+        children[parent].append((is_file, entry.name, relative_name))
+
+    lines: list[str] = []
+    queue: deque[tuple[str, int]] = deque([("", 1)])
+    while queue:
+        parent, depth = queue.popleft()
         indent = "  " * (depth - 1)
-        prefix = "├─ " if depth > 0 else ""
-        display = f"{indent}{prefix}{relative.name}"
-        if path.is_dir():
-            lines.append(display + "/")
-        else:
-            if path.suffix.lower() in SKIP_EXTENSIONS:
-                continue
-            lines.append(display)
+        for is_file, name, relative_name in sorted(children.get(parent, ())):
+            if is_file:
+                lines.append(f"{indent}├─ {name}")
+            else:
+                lines.append(f"{indent}├─ {name}/")
+                queue.append((relative_name, depth + 1))
     return "\n".join(lines)
 
 
-def read_text(path: Path) -> str:
-    """Read file content using utf-8 with fallback."""
+def decode_text(data: bytes) -> str:
+    """Decode raw file bytes as utf-8, replacing undecodable bytes."""
 
-    try:
-        return path.read_text(encoding="utf-8")
-    except UnicodeDecodeError:
-        return path.read_text(encoding="latin-1")
+    return data.decode("utf-8", errors="replace")
 
 
-def extract_symbol_table(path: Path, language: str) -> list[SymbolInfo]:
-    """Return lightweight symbol information for known languages."""
+def extract_symbol_table_from_text(
+    text: str,
+    language: str,
+    lines: list[str] | None = None,
+) -> SymbolTable:
+    """Return symbol information for already-loaded source text.
 
-    text = read_text(path)
-    lines = text.splitlines()
+    ``lines`` may carry ``text.splitlines()`` when the caller has it already.
+    """
+
+    if language == "Python":
+        symbols = _extract_python_symbols_ast(text)
+        if symbols is not None:
+            return symbols
+
+    if lines is None:
+        lines = text.splitlines()
     if language in {"TypeScript", "JavaScript"}:
-        symbols = _extract_typescript_symbols(lines)
+        symbols = _extract_typescript_symbols(text)
     elif language == "Python":
         symbols = _extract_python_symbols(lines)
     else:
-        symbols = []
+        symbols = SymbolTable()
 
     total_lines = len(lines) if lines else 1
     _fill_symbol_line_ends(symbols, total_lines)
     return symbols
 
 
-CLASS_RE = re.compile(r"\bclass\s+([A-Za-z0-9_]+)")
-TS_FUNCTION_RE = re.compile(r"\bfunction\s+([A-Za-z0-9_]+)\s*\(")
-TS_METHOD_RE = re.compile(
-    r"^\s*(public|protected|private)?\s*(static\s+)?(async\s+)?([A-Za-z0-9_]+)\s*\("
-)
-TS_ARROW_METHOD_RE = re.compile(
-    r"^\s*(public|protected|private)?\s*(static\s+)?([A-Za-z0-9_]+)\s*=\s*(async\s+)?\("
+# Horizontal whitespace only: the pattern runs over the whole file, so it must
+# never match across line breaks. The lookahead rejects control-flow lines
+# such as `if (` before the method alternatives are attempted. `catch` is only
+# rejected with a bare `(e)` parameter: NestJS exception filters define a real
+# `catch(exception: ..., host: ...)` method.
+_WS = r"[^\S\r\n]"
+TS_SYMBOL_RE = re.compile(
+    rf"(?P<class>\bclass{_WS}+(?P<class_name>\w+))"
+    rf"|(?P<function>\bfunction{_WS}+(?P<function_name>\w+){_WS}*\()"
+    rf"|^(?!{_WS}*(?:(?:if|for|while|switch|return|do)\b|catch{_WS}*\({_WS}*\w*{_WS}*\)))"
+    rf"{_WS}*(?:public|protected|private)?{_WS}*(?:static{_WS}+)?"
+    rf"(?:(?:async{_WS}+)?(?P<method_name>\w+){_WS}*\("
+    rf"|(?P<arrow_name>\w+){_WS}*={_WS}*(?:async{_WS}+)?\()",
+    re.MULTILINE | re.ASCII,
 )
 
 
-def _extract_typescript_symbols(lines: list[str]) -> list[SymbolInfo]:
-    symbols: list[SymbolInfo] = []
-    brace_depth = 0
-    class_stack: list[tuple[str, int]] = []
+# Every separator str.splitlines() breaks on; line numbers come from
+# splitlines(), so `^` in TS_SYMBOL_RE must see the same line boundaries.
+_LINE_BREAK_RE = re.compile("\r\n|[\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]")
 
-    for idx, line in enumerate(lines, start=1):
-        stripped = line.strip()
-        brace_delta = line.count("{") - line.count("}")
 
-        class_match = CLASS_RE.search(line)
-        if class_match:
-            class_name = class_match.group(1)
+def _extract_typescript_symbols(text: str) -> SymbolTable:
+    symbols = SymbolTable()
+    class_stack: list[tuple[str, int]] = []
+
+    text = _LINE_BREAK_RE.sub("\n", text)
+    lines = text.splitlines(keepends=True)
+    line_starts = [0, *accumulate(map(len, lines))]
+    # Brace depth at each line end, computed with C-level map/accumulate
+    # rather than a per-line Python loop.
+    opens = map(str.count, lines, repeat("{"))
+    closes = map(str.count, lines, repeat("}"))
+    line_end_depths = list(accumulate(map(sub, opens, closes)))
+    # Number of line ends whose depth has already been used to close classes.
+    closed_through = 0
+
+    for match in TS_SYMBOL_RE.finditer(text):
+        line_index = bisect_right(line_starts, match.start()) - 1
+        if line_index > closed_through:
+            # Classes close as soon as any line end drops below their body depth.
+            lowest_depth = min(line_end_depths[closed_through:line_index])
+            while class_stack and lowest_depth < class_stack[-1][1]:
+                class_stack.pop()
+            closed_through = line_index
+
+        idx = line_index + 1
+        if match.group("class"):
+            brace_depth = line_end_depths[line_index - 1] if line_index else 0
+            brace_delta = line_end_depths[line_index] - brace_depth
             future_depth = brace_depth + max(brace_delta, 1)
-            class_stack.append((class_name, future_depth))
-
-        current_class = class_stack[-1][0] if class_stack else None
-
-        method_match = TS_METHOD_RE.match(line)
-        if method_match and current_class:
-            method_name = method_match.group(4)
-            symbols.append(
-                SymbolInfo(
-                    name=f"{current_class}.{method_name}",
-                    kind="method",
-                    line_start=idx,
-                    line_end=idx,
-                )
-            )
-
-        arrow_match = TS_ARROW_METHOD_RE.match(line)
-        if arrow_match and current_class:
-            method_name = arrow_match.group(3)
-            symbols.append(
-                SymbolInfo(
-                    name=f"{current_class}.{method_name}",
-                    kind="method",
-                    line_start=idx,
-                    line_end=idx,
-                )
-            )
-
-        function_match = TS_FUNCTION_RE.search(line)
-        if function_match:
-            func_name = function_match.group(1)
-            symbols.append(
-                SymbolInfo(
-                    name=func_name,
-                    kind="function",
-                    line_start=idx,
-                    line_end=idx,
-                )
-            )
-
-        brace_depth += brace_delta
-        while class_stack and brace_depth < class_stack[-1][1]:
-            class_stack.pop()
+            class_stack.append((match.group("class_name"), future_depth))
+        elif match.group("function"):
+            symbols.append(match.group("function_name"), "function", idx, idx)
+        elif class_stack:
+            method_name = match.group("method_name") or match.group("arrow_name")
+            symbols.append(f"{class_stack[-1][0]}.{method_name}", "method", idx, idx)
 
     return symbols
 
 
+class _PythonSymbolVisitor(ast.NodeVisitor):
+    """Collect classes and functions in source order with exact line ranges."""
+
+    def __init__(self) -> None:
+        self.symbols = SymbolTable()
+        self.class_stack: list[str] = []
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        self.symbols.append(node.name, "class", node.lineno, node.end_lineno or node.lineno)
+        self.class_stack.append(node.name)
+        self.generic_visit(node)
+        self.class_stack.pop()
+
+    def visit_FunctionDef(self, node: ast.FunctionDef | ast.AsyncFunctionDef) -> None:
+        name = f"{self.class_stack[-1]}.{node.name}" if self.class_stack else node.name
+        self.symbols.append(name, "function", node.lineno, node.end_lineno or node.lineno)
+        self.generic_visit(node)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+
+def _extract_python_symbols_ast(text: str) -> SymbolTable | None:
+    """Return symbols parsed with ast, or None when the source does not parse."""
+
+    # Pathologically nested expressions can exhaust the parser's recursion
+    # limit or memory; the regex extractor handles those files instead.
+    visitor = _PythonSymbolVisitor()
+    try:
+        visitor.visit(ast.parse(text))
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        return None
+    return visitor.symbols
+
+
 PY_DEF_RE = re.compile(r"^\s*def\s+([A-Za-z0-9_]+)\s*\(")
 PY_CLASS_RE = re.compile(r"^\s*class\s+([A-Za-z0-9_]+)")
 
 
-def _extract_python_symbols(lines: list[str]) -> list[SymbolInfo]:
-    symbols: list[SymbolInfo] = []
+def _extract_python_symbols(lines: list[str]) -> SymbolTable:
+    symbols = SymbolTable()
     class_stack: list[tuple[str, int]] = []
 
     for idx, line in enumerate(lines, start=1):
@@ -280,14 +379,7 @@ def _extract_python_symbols(lines: list[str]) -> list[SymbolInfo]:
         if class_match:
             class_name = class_match.group(1)
             class_stack.append((class_name, indent))
-            symbols.append(
-                SymbolInfo(
-                    name=class_name,
-                    kind="class",
-                    line_start=idx,
-                    line_end=idx,
-                )
-            )
+            symbols.append(class_name, "class", idx, idx)
             continue
 
         func_match = PY_DEF_RE.match(line)
@@ -295,23 +387,18 @@ def _extract_python_symbols(lines: list[str]) -> list[SymbolInfo]:
             func_name = func_match.group(1)
             if class_stack:
                 func_name = f"{class_stack[-1][0]}.{func_name}"
-            symbols.append(
-                SymbolInfo(
-                    name=func_name,
-                    kind="function",
-                    line_start=idx,
-                    line_end=idx,
-                )
-            )
+            symbols.append(func_name, "function", idx, idx)
 
     return symbols
 
 
-def _fill_symbol_line_ends(symbols: list[SymbolInfo], total_lines: int) -> None:
-    symbols.sort(key=lambda s: s.line_start)
-    for index, symbol in enumerate(symbols):
-        if index + 1 < len(symbols):
-            next_start = symbols[index + 1].line_start
-            symbol.line_end = max(symbol.line_start, next_start - 1)
-        else:
-            symbol.line_end = total_lines
+def _fill_symbol_line_ends(symbols: SymbolTable, total_lines: int) -> None:
+    # Extractors emit symbols in source order, so no sort is needed here.
+    starts = symbols.starts
+    if __debug__:
+        assert all(a <= b for a, b in zip(starts, starts[1:]))
+    ends = symbols.ends
+    for index in range(len(starts) - 1):
+        ends[index] = max(starts[index], starts[index + 1] - 1)
+    if starts:
+        ends[-1] = total_lines
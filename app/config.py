@@ -7,10 +7,12 @@ from dataclasses import dataclass
 from functools import lru_cache
 from typing import Literal
 
+import tiktoken
 
 DEFAULT_OPENAI_MODEL = "gpt-5"
 PLACEHOLDER_SENTINEL = "REPLACE_WITH_OPENAI_API_KEY"
 OPENAI_API_KEY_PLACEHOLDER = "REPLACE_WITH_OPENAI_API_KEY"
+DEFAULT_SUMMARY_CACHE_DIR = "~/.cache/ai-reviewer"
 
 
 @dataclass(frozen=True)
@@ -26,6 +28,8 @@ class Settings:
     max_prompt_tokens: int = 10_000
     summarize_temperature: float = 0.1
     report_temperature: float = 0.0
+    max_concurrent_requests: int = 16
+    summary_cache_dir: str | None = DEFAULT_SUMMARY_CACHE_DIR
     environment: Literal["development", "production"] = "development"
 
 
@@ -65,5 +69,17 @@ def get_settings() -> Settings:
         max_prompt_tokens=int(os.getenv("MAX_PROMPT_TOKENS", "10000")),
         summarize_temperature=float(os.getenv("SUMMARIZE_TEMPERATURE", "0.1")),
         report_temperature=float(os.getenv("REPORT_TEMPERATURE", "0.0")),
+        max_concurrent_requests=int(os.getenv("MAX_CONCURRENT_REQUESTS", "16")),
+        summary_cache_dir=os.getenv("SUMMARY_CACHE_DIR", DEFAULT_SUMMARY_CACHE_DIR) or None,
         environment=os.getenv("ENVIRONMENT", "development"),  # type: ignore[arg-type]
     )
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str) -> tiktoken.Encoding:
+    """Return the memoized tiktoken encoding for a model."""
+
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
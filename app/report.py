@@ -2,16 +2,19 @@
 
 from __future__ import annotations
 
+import asyncio
+import io
 import json
 import logging
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List
 
-from openai import OpenAI, OpenAIError
+import tiktoken
+from openai import AsyncOpenAI, OpenAIError
 
-from .codebase import FileCandidate, build_directory_overview, collect_source_candidates
-from .config import Settings
+from .codebase import FileCandidate, scan_repository
+from .config import Settings, get_encoding
 from .summarizer import FileSummary, GPTSummarizer
 
 logger = logging.getLogger(__name__)
@@ -28,20 +31,25 @@ class AnalysisArtifacts:
     summaries: List[FileSummary]
 
 
-def analyze_repository(problem_description: str, repo_path: Path, settings: Settings) -> Dict[str, Any]:
+async def analyze_repository(problem_description: str, repo_path: Path, settings: Settings) -> Dict[str, Any]:
     """Run the full analysis pipeline and return the structured report."""
 
-    artifacts = _gather_artifacts(problem_description, repo_path, settings)
-    prompt = _compose_prompt(problem_description, artifacts, max_chars=settings.max_prompt_tokens * 4)
-    raw_report = _request_report(prompt, settings)
+    artifacts = await _gather_artifacts(problem_description, repo_path, settings)
+    prompt = await asyncio.to_thread(
+        _compose_prompt,
+        problem_description,
+        artifacts,
+        encoding=get_encoding(settings.openai_model),
+        max_tokens=settings.max_prompt_tokens,
+    )
+    raw_report = await _request_report(prompt, settings)
     return _validate_report(raw_report)
 
 
-def _gather_artifacts(problem_description: str, repo_path: Path, settings: Settings) -> AnalysisArtifacts:
-    candidates = collect_source_candidates(repo_path, settings)
+async def _gather_artifacts(problem_description: str, repo_path: Path, settings: Settings) -> AnalysisArtifacts:
+    candidates, overview = await asyncio.to_thread(scan_repository, repo_path, settings)
     summarizer = GPTSummarizer(settings)
-    summaries = summarizer.summarize_candidates(candidates, problem_description)
-    overview = build_directory_overview(repo_path)
+    summaries = await summarizer.summarize_candidates(candidates, problem_description)
     return AnalysisArtifacts(
         directory_overview=overview,
         candidates=candidates,
@@ -49,67 +57,100 @@ def _gather_artifacts(problem_description: str, repo_path: Path, settings: Setti
     )
 
 
+PROMPT_OUTPUT_FORMAT = "\n".join(
+    [
+        "## Output Format",
+        "Return a JSON object with:",
+        "- feature_analysis: array of objects with feature_description (string, Simplified Chinese) and implementation_location (array with file, function, lines).",
+        "- execution_plan_suggestion: string with concise instructions to run the project in Simplified Chinese.",
+        "Use the symbol table above to cite precise function or method names and provide line numbers or ranges.",
+        "Do not leave function or lines as null; if only a single line is known, use that number.",
+        "Only output JSON without additional commentary.",
+    ]
+)
+
+PROMPT_OMITTED_NOTE = "...[{count} file summaries omitted due to length]...\n\n"
+PROMPT_TRUNCATED_NOTE = "\n...[context truncated due to length]..."
+
+
 def _compose_prompt(
     problem_description: str,
     artifacts: AnalysisArtifacts,
     *,
-    max_chars: int,
+    encoding: tiktoken.Encoding,
+    max_tokens: int,
 ) -> str:
-    lines = [
-        "# Task",
-        "Analyze the repository and map implementation details to the requested features.",
-        "",
-        "## Requirements",
-        problem_description.strip(),
-        "",
-        "## Repository Overview",
-        artifacts.directory_overview or "(overview truncated)",
-        "",
-        "## File Summaries",
-    ]
+    """Assemble the report prompt within max_tokens.
+
+    Summaries arrive in descending weight order, so when the budget runs out
+    the trailing (lowest-weight) summaries are dropped first.
+    """
+
+    header = (
+        "# Task\n"
+        "Analyze the repository and map implementation details to the requested features.\n"
+        "\n"
+        "## Requirements\n"
+        f"{problem_description.strip()}\n"
+        "\n"
+        "## Repository Overview\n"
+        f"{artifacts.directory_overview or '(overview truncated)'}\n"
+        "\n"
+        "## File Summaries\n"
+    )
+    buffer = io.StringIO()
+    write = buffer.write
+    write(header)
 
     if not artifacts.summaries:
-        lines.append("No summaries available; rely on repository overview and prior knowledge.")
+        write("No summaries available; rely on repository overview and prior knowledge.\n")
     else:
-        for summary in artifacts.summaries:
-            relative_path = summary.relative_path
-            lines.extend(
-                [
-                    f"### {relative_path}",
-                    f"Language: {summary.language}",
-                    summary.summary,
-                    "",
-                ]
-            )
-            if summary.symbols:
-                lines.append("Symbols with line ranges:")
-                for symbol in summary.symbols:
-                    if symbol.line_start == symbol.line_end:
-                        line_display = str(symbol.line_start)
-                    else:
-                        line_display = f"{symbol.line_start}-{symbol.line_end}"
-                    lines.append(f"- {symbol.name} ({symbol.kind}) lines {line_display}")
-                lines.append("")
-
-    lines.extend(
-        [
-            "## Output Format",
-            "Return a JSON object with:",
-            "- feature_analysis: array of objects with feature_description (string, Simplified Chinese) and implementation_location (array with file, function, lines).",
-            "- execution_plan_suggestion: string with concise instructions to run the project in Simplified Chinese.",
-            "Use the symbol table above to cite precise function or method names and provide line numbers or ranges.",
-            "Do not leave function or lines as null; if only a single line is known, use that number.",
-            "Only output JSON without additional commentary.",
-        ]
-    )
-    prompt = "\n".join(lines)
-    if len(prompt) > max_chars:
-        prompt = prompt[: max(0, max_chars - 100)] + "\n...[context truncated due to length]..."
+        sections = [_format_summary_section(summary) for summary in artifacts.summaries]
+        header_tokens, footer_tokens, note_tokens, *section_tokens = map(
+            len,
+            map(
+                encoding.encode_ordinary,
+                [header, PROMPT_OUTPUT_FORMAT, PROMPT_OMITTED_NOTE.format(count=len(sections)), *sections],
+            ),
+        )
+        budget = max_tokens - header_tokens - footer_tokens
+        used = 0
+        included = 0
+        for section, tokens in zip(sections, section_tokens):
+            reserve = note_tokens if included + 1 < len(sections) else 0
+            if used + tokens + reserve > budget:
+                break
+            write(section)
+            used += tokens
+            included += 1
+        if included < len(sections):
+            write(PROMPT_OMITTED_NOTE.format(count=len(sections) - included))
+
+    write(PROMPT_OUTPUT_FORMAT)
+    prompt = buffer.getvalue()
+
+    # Token counts of separately encoded sections are not strictly additive,
+    # and the header alone may exceed the budget, so enforce the limit exactly.
+    tokens = encoding.encode_ordinary(prompt)
+    if len(tokens) > max_tokens:
+        keep = max(0, max_tokens - len(encoding.encode_ordinary(PROMPT_TRUNCATED_NOTE)))
+        prompt = encoding.decode(tokens[:keep]) + PROMPT_TRUNCATED_NOTE
     return prompt
 
 
-def _request_report(prompt: str, settings: Settings) -> str:
-    client = OpenAI(
+def _format_summary_section(summary: FileSummary) -> str:
+    section = f"### {summary.relative_path}\nLanguage: {summary.language}\n{summary.summary}\n\n"
+    if not summary.symbols:
+        return section
+    symbol_lines = "".join(
+        f"- {name} ({kind}) lines {start}\n" if start == end else f"- {name} ({kind}) lines {start}-{end}\n"
+        for name, kind, start, end in summary.symbols.rows()
+    )
+    return f"{section}Symbols with line ranges:\n{symbol_lines}\n"
+
+
+async def _request_report(prompt: str, settings: Settings) -> str:
+    client = AsyncOpenAI(
         api_key=settings.openai_api_key,
         base_url=settings.openai_base_url,
     )
@@ -121,19 +162,25 @@ def _request_report(prompt: str, settings: Settings) -> str:
         "All natural-language content must be written in Simplified Chinese."
     )
 
+    # Stream the response so text is accumulated while the model is still
+    # generating; this is also the hook for forwarding progress to clients.
+    buffer = io.StringIO()
     try:
-        response = client.responses.create(
+        async with client.responses.stream(
             model=settings.openai_model,
             input=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": prompt},
             ],
-        )
+        ) as stream:
+            async for event in stream:
+                if event.type == "response.output_text.delta":
+                    buffer.write(event.delta)
     except OpenAIError as exc:
         logger.exception("Failed to obtain report from OpenAI: %s", exc)
         raise ReportGenerationError("Failed to generate report") from exc
 
-    return response.output_text
+    return buffer.getvalue()
 
 
 def _validate_report(text: str) -> Dict[str, Any]:
@@ -2,24 +2,42 @@
 
 from __future__ import annotations
 
+import asyncio
+import atexit
 import logging
-from dataclasses import dataclass
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterable, List
+from typing import Iterable, Optional
 
-import tiktoken
-from openai import OpenAI, OpenAIError
+from openai import AsyncOpenAI, OpenAIError
 
+from .cache import content_digest, make_cache_key, open_summary_cache
 from .codebase import (
     FileCandidate,
-    SymbolInfo,
-    extract_symbol_table,
-    read_text,
+    SymbolTable,
+    decode_text,
+    extract_symbol_table_from_text,
 )
-from .config import Settings
+from .config import Settings, get_encoding
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the summarization prompts or the cached payload change so
+# cached summaries are invalidated.
+SUMMARY_PROMPT_VERSION = 2
+
+# Files handed to a symbol-extraction worker per task. Batches that fit in a
+# couple of tasks gain nothing from the pool and are parsed in-process.
+SYMBOL_POOL_CHUNKSIZE = 16
+
+_symbol_pool: ProcessPoolExecutor | None = None
+_symbol_pool_lock = threading.Lock()
+
 
 @dataclass
 class FileSummary:
@@ -27,7 +45,7 @@ class FileSummary:
     relative_path: Path
     language: str
     summary: str
-    symbols: List[SymbolInfo]
+    symbols: SymbolTable
 
 
 @dataclass
@@ -37,58 +55,163 @@ class CodeChunk:
     end_line: int
 
 
+@dataclass
+class _PendingSummary:
+    candidate: FileCandidate
+    cache_key: str
+    chunks: list[CodeChunk]
+    symbols: SymbolTable = field(default_factory=SymbolTable)
+    chunk_summaries: list[str] = field(default_factory=list)
+    cached_summary: Optional[str] = None
+
+
 class GPTSummarizer:
     """Summaries source files using GPT models."""
 
     def __init__(self, settings: Settings):
         self.settings = settings
-        self.client = OpenAI(
+        self.client = AsyncOpenAI(
             api_key=settings.openai_api_key,
             base_url=settings.openai_base_url,
         )
-        self.encoding = self._resolve_encoding(settings.openai_model)
+        self.encoding = get_encoding(settings.openai_model)
+        self.cache = open_summary_cache(settings.summary_cache_dir)
+        self._prefix_tokens: list[int] = []
 
-    def summarize_candidates(
+    async def summarize_candidates(
         self,
         candidates: Iterable[FileCandidate],
         problem_description: str,
     ) -> list[FileSummary]:
         """Generate high-level summaries for selected files."""
 
-        summaries: list[FileSummary] = []
+        # Reading, tokenizing and symbol extraction are blocking; keep them off
+        # the event loop so other requests can make progress.
+        entries = await asyncio.to_thread(self._prepare_entries, list(candidates), problem_description)
+
+        # Dispatch every chunk of every file at once; the semaphore keeps the
+        # number of in-flight requests within the configured limit.
+        semaphore = asyncio.Semaphore(max(1, self.settings.max_concurrent_requests))
+        outcomes = await asyncio.gather(
+            *(
+                self._summarize_chunk_limited(semaphore, chunk, entry.candidate, problem_description)
+                for entry in entries
+                for chunk in entry.chunks
+            ),
+            return_exceptions=True,
+        )
+
+        offset = 0
+        for entry in entries:
+            for outcome in outcomes[offset : offset + len(entry.chunks)]:
+                if isinstance(outcome, OpenAIError):
+                    logger.error("Failed to summarize %s: %s", entry.candidate.path, outcome)
+                elif isinstance(outcome, BaseException):
+                    raise outcome
+                else:
+                    entry.chunk_summaries.append(outcome)
+            offset += len(entry.chunks)
+
+        return await asyncio.to_thread(self._collect_summaries, entries)
+
+    def _prepare_entries(
+        self,
+        candidates: list[FileCandidate],
+        problem_description: str,
+    ) -> list[_PendingSummary]:
+        """Resolve cached summaries, chunk the remaining files and extract symbols.
+
+        Only summaries are cached; symbols are cheap to recompute and always
+        come from the current extractor.
+        """
+
+        entries: list[_PendingSummary] = []
+        pending: list[tuple[_PendingSummary, str, list[str]]] = []
+        problem_digest = content_digest(problem_description.encode("utf-8"))
         for candidate in candidates:
-            text = read_text(candidate.path)
-            chunks = self._chunk_text(text)
-            if not chunks:
-                continue
-            symbols = extract_symbol_table(candidate.path, candidate.language)
-            chunk_summaries: list[str] = []
-            for chunk in chunks:
-                try:
-                    chunk_summary = self._summarize_chunk(
-                        chunk,
-                        candidate,
-                        problem_description,
-                    )
-                except OpenAIError as exc:
-                    logger.exception("Failed to summarize %s: %s", candidate.path, exc)
+            data = candidate.path.read_bytes()
+            cache_key = self._cache_key(candidate, data, problem_digest)
+            text = decode_text(data)
+            lines = text.splitlines()
+            cached_summary = self._load_cached_summary(cache_key)
+            if cached_summary is not None:
+                entry = _PendingSummary(candidate, cache_key, [], cached_summary=cached_summary)
+            else:
+                chunks = self._chunk_text(lines)
+                if not chunks:
                     continue
-                chunk_summaries.append(chunk_summary)
-            if not chunk_summaries:
+                entry = _PendingSummary(candidate, cache_key, chunks)
+            entries.append(entry)
+            pending.append((entry, text, lines))
+
+        for (entry, _, _), symbols in zip(pending, _extract_symbol_tables(pending)):
+            entry.symbols = symbols
+        return entries
+
+    def _collect_summaries(self, entries: list[_PendingSummary]) -> list[FileSummary]:
+        """Combine chunk summaries per file and store fresh results in the cache."""
+
+        summaries: list[FileSummary] = []
+        for entry in entries:
+            if entry.cached_summary is not None:
+                summaries.append(self._file_summary(entry, entry.cached_summary))
                 continue
-            combined = self._combine_chunk_summaries(chunk_summaries)
-            summaries.append(
-                FileSummary(
-                    path=candidate.path,
-                    relative_path=candidate.relative_path,
-                    language=candidate.language,
-                    summary=combined,
-                    symbols=symbols,
-                )
-            )
+            if not entry.chunk_summaries:
+                continue
+            combined = self._combine_chunk_summaries(entry.chunk_summaries)
+            summaries.append(self._file_summary(entry, combined))
+            # Partial results are returned but never cached, so failed chunks
+            # are retried on the next run.
+            if len(entry.chunk_summaries) == len(entry.chunks):
+                self._store_cached_summary(entry.cache_key, combined)
         return summaries
 
-    def _summarize_chunk(
+    @staticmethod
+    def _file_summary(entry: _PendingSummary, summary: str) -> FileSummary:
+        return FileSummary(
+            path=entry.candidate.path,
+            relative_path=entry.candidate.relative_path,
+            language=entry.candidate.language,
+            summary=summary,
+            symbols=entry.symbols,
+        )
+
+    def _cache_key(self, candidate: FileCandidate, data: bytes, problem_digest: str) -> str:
+        return make_cache_key(
+            content_digest(data),
+            candidate.relative_path.as_posix(),
+            candidate.language,
+            problem_digest,
+            self.settings.openai_model,
+            self.settings.max_tokens_per_chunk,
+            SUMMARY_PROMPT_VERSION,
+        )
+
+    def _load_cached_summary(self, cache_key: str) -> Optional[str]:
+        if self.cache is None:
+            return None
+        payload = self.cache.get(cache_key)
+        if payload is None:
+            return None
+        summary = payload.get("summary")
+        return summary if isinstance(summary, str) else None
+
+    def _store_cached_summary(self, cache_key: str, summary: str) -> None:
+        if self.cache is None:
+            return
+        self.cache.set(cache_key, {"summary": summary})
+
+    async def _summarize_chunk_limited(
+        self,
+        semaphore: asyncio.Semaphore,
+        code_chunk: CodeChunk,
+        candidate: FileCandidate,
+        problem_description: str,
+    ) -> str:
+        async with semaphore:
+            return await self._summarize_chunk(code_chunk, candidate, problem_description)
+
+    async def _summarize_chunk(
         self,
         code_chunk: CodeChunk,
         candidate: FileCandidate,
@@ -109,7 +232,7 @@ class GPTSummarizer:
             f"Code chunk (line numbers included):\n```{candidate.language.lower()}\n{code_chunk.text}\n```"
         )
 
-        response = self.client.responses.create(
+        response = await self.client.responses.create(
             model=self.settings.openai_model,
             max_output_tokens=300,
             input=[
@@ -127,22 +250,37 @@ class GPTSummarizer:
         bullet_points = "\n".join(f"- {summary.strip()}" for summary in chunk_summaries)
         return f"Key points:\n{bullet_points}"
 
-    def _chunk_text(self, text: str) -> list[str]:
-        """Split text into token-aware chunks with preserved line numbers."""
+    def _prefix_token_counts(self, line_count: int) -> list[int]:
+        """Return token counts of the "NNNN: " prefixes for lines 1..line_count."""
+
+        known = len(self._prefix_tokens)
+        if line_count > known:
+            prefixes = [f"{line_number:04}: " for line_number in range(known + 1, line_count + 1)]
+            self._prefix_tokens.extend(map(len, map(self.encoding.encode_ordinary, prefixes)))
+        return self._prefix_tokens
+
+    def _chunk_text(self, lines: list[str]) -> list[CodeChunk]:
+        """Split source lines into token-aware chunks with preserved line numbers."""
 
-        if not text:
+        if not lines:
             return []
 
-        lines = text.splitlines()
         max_tokens = self.settings.max_tokens_per_chunk
         chunks: list[CodeChunk] = []
         current_lines: list[str] = []
         current_tokens = 0
         chunk_start_line = 1
 
-        for line_number, line in enumerate(lines, start=1):
+        # Only line bodies are encoded per file (encode_ordinary skips the
+        # special-token scan); line-number prefixes are counted separately and
+        # reused across files. Summing the two can only overestimate, so chunks
+        # never exceed the limit.
+        prefix_tokens = self._prefix_token_counts(len(lines))
+        body_tokens = map(len, map(self.encoding.encode_ordinary, [line + "\n" for line in lines]))
+
+        for line_number, (line, body_count) in enumerate(zip(lines, body_tokens), start=1):
             formatted = f"{line_number:04}: {line}"
-            token_count = len(self.encoding.encode(formatted + "\n"))
+            token_count = prefix_tokens[line_number - 1] + body_count
 
             if current_lines and current_tokens + token_count > max_tokens:
                 chunk_text = "\n".join(current_lines)
@@ -176,9 +314,57 @@ class GPTSummarizer:
 
         return chunks
 
-    @staticmethod
-    def _resolve_encoding(model: str):
+
+def _extract_symbol_tables(pending: list[tuple[_PendingSummary, str, list[str]]]) -> list[SymbolTable]:
+    """Extract symbols for every pending file, across processes for large batches.
+
+    ast parsing and regex scanning hold the GIL, so only separate processes
+    scale this step. Workers receive the already-decoded text, never re-reading
+    files.
+    """
+
+    pool = None
+    if len(pending) > 2 * SYMBOL_POOL_CHUNKSIZE:
+        pool = _get_symbol_pool()
+    if pool is not None:
+        texts = [text for _, text, _ in pending]
+        languages = [entry.candidate.language for entry, _, _ in pending]
         try:
-            return tiktoken.encoding_for_model(model)
-        except KeyError:
-            return tiktoken.get_encoding("cl100k_base")
+            return list(
+                pool.map(extract_symbol_table_from_text, texts, languages, chunksize=SYMBOL_POOL_CHUNKSIZE)
+            )
+        except BrokenProcessPool:
+            logger.exception("Symbol extraction pool failed; parsing in-process")
+            _discard_symbol_pool(pool)
+
+    return [
+        extract_symbol_table_from_text(text, entry.candidate.language, lines)
+        for entry, text, lines in pending
+    ]
+
+
+def _get_symbol_pool() -> ProcessPoolExecutor | None:
+    """Return the shared extraction pool, creating it on first use.
+
+    One pool is reused across requests so worker start-up is paid once per
+    server process rather than once per /analyze call.
+    """
+
+    global _symbol_pool
+    if (os.cpu_count() or 1) < 2:
+        return None
+    with _symbol_pool_lock:
+        if _symbol_pool is None:
+            # Forking a threaded server process is unsafe; use a fork server where available.
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _symbol_pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context(start_method))
+            atexit.register(_symbol_pool.shutdown)
+        return _symbol_pool
+
+
+def _discard_symbol_pool(pool: ProcessPoolExecutor) -> None:
+    global _symbol_pool
+    with _symbol_pool_lock:
+        if _symbol_pool is pool:
+            _symbol_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)